@@ -13,10 +13,15 @@ class AnalysisAgent(BaseAgent):
             return {"success": False, "error": results.get("error", "No results found.")}
 
         data = results.get("data", [])
+        # /api/query/execute responds with {"success", "rows", "rowCount", ...}
+        if isinstance(data, dict):
+            if not data.get("success"):
+                return {"success": False, "error": data.get("error") or data.get("message")}
+            data = data.get("rows") or []
         if not data:
             return {"success": True, "summary": "No results found."}
 
-        df = pd.DataFrame(data)
+        df = pd.DataFrame.from_records(data)
         summary = f"Result has {len(df)} rows and {len(df.columns)} columns.\n"
         summary += "Top 5 rows:\n"
         summary += df.head(5).to_string(index=False)
@@ -1,33 +1,41 @@
 # agents/intent_agent.py
 
 from .base_agent import BaseAgent
+from functools import lru_cache
+
+INTENT_PROMPT = """You are an intent classifier.
+Classify this message into one of the following intents:
+["query", "visualization", "schema", "context", "multi-db", "chat"]
+
+User Message:
+"{message}"
+
+Respond ONLY with the label."""
 
 class IntentAgent(BaseAgent):
     def __init__(self, name: str, client, model: str):
         super().__init__(name)
         self.client = client
         self.model = model
+        # Same message always gets the same label (temperature=0), so repeat
+        # greetings and common questions skip the LLM round-trip. Failures
+        # raise and are therefore never cached.
+        self._classify = lru_cache(maxsize=2048)(self._classify_uncached)
 
     def run(self, task: dict) -> dict:
         message = task["message"]
 
-        prompt = f"""You are an intent classifier.
-Classify this message into one of the following intents:
-["query", "visualization", "schema", "context", "multi-db", "chat"]
-
-User Message:
-"{message}"
-
-Respond ONLY with the label."""
-
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0,
-                max_tokens=10
-            )
-            intent = response.choices[0].message.content.strip().lower()
-            return {"intent": intent}
+            return {"intent": self._classify(message)}
         except Exception as e:
             return {"intent": "chat", "error": str(e)}
+
+    def _classify_uncached(self, message: str) -> str:
+        prompt = INTENT_PROMPT.format(message=message)
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+            max_tokens=10
+        )
+        return response.choices[0].message.content.strip().lower()
@@ -45,7 +45,9 @@ class OrchestratorAgent(BaseAgent):
             return self.memory_agent.run(task)
 
         elif intent in ["query", "multi-db"]:
-            schema_result = self.schema_agent.run(task)
+            # Only the raw schema is needed here; SchemaAgent.run would also
+            # spend an LLM call describing it
+            schema_result = self.schema_agent.fetch_schema(task)
             if not schema_result.get("success"):
                 return self.chat_agent.run({
                     **task,
@@ -53,7 +55,16 @@ class OrchestratorAgent(BaseAgent):
                 })
 
             task["schema"] = schema_result.get("schema")
+            task["schema_json"] = schema_result.get("schema_json")
 
+            generated = self.query_agent.generate_query(task)
+            if not generated.get("success"):
+                return self.chat_agent.run({
+                    **task,
+                    "output": f"Query generation failed: {generated.get('error')}"
+                })
+
+            # Validate the SQL that will actually be executed
             validation_result = self.validation_agent.run(task)
             if not validation_result.get("success"):
                 return self.chat_agent.run({
@@ -61,7 +72,7 @@ class OrchestratorAgent(BaseAgent):
                     "output": f"Query rejected: {validation_result.get('reason')}"
                 })
 
-            query_result = self.query_agent.run(task)
+            query_result = self.query_agent.execute_query(task)
             if not query_result.get("success"):
                 return self.chat_agent.run({
                     **task,
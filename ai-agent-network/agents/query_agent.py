@@ -1,4 +1,5 @@
 from .base_agent import BaseAgent
+from .validation_agent import BANNED_PHRASES_RE
 from tools import backend_bridge
 import json
 
@@ -9,16 +10,24 @@ class QueryAgent(BaseAgent):
         self.model = model
 
     def run(self, task: dict) -> dict:
-        user_id = task.get("user_id")
+        generated = self.generate_query(task)
+        if not generated.get("success"):
+            return generated
+        return self.execute_query(task)
+
+    def generate_query(self, task: dict) -> dict:
+        """
+        Generate SQL for the task's message into task["query"] without
+        running it, so it can be validated before execution.
+        """
         db_info = task.get("db_info")
         schema = task.get("schema")
         message = task.get("message")
         query = task.get("query")
 
-        if not user_id or not db_info or not message:
+        if not task.get("user_id") or not db_info or not message:
             return {"success": False, "error": "Missing user_id, db_info, or message."}
 
-        # Step 1: Generate query if not present
         if not query:
             if not schema:
                 return {"success": False, "error": "Missing schema to generate query."}
@@ -29,7 +38,7 @@ You are a SQL generation AI for a {db_type.upper()} database.
 ONLY return raw SQL. Do NOT explain, format, or wrap in markdown.
 
 User: {message}
-Schema: {json.dumps(schema, indent=2)}
+Schema: {task.get("schema_json") or json.dumps(schema, indent=2)}
 """
 
             try:
@@ -50,10 +59,24 @@ Schema: {json.dumps(schema, indent=2)}
             except Exception as e:
                 return {"success": False, "error": f"Query generation failed: {str(e)}"}
 
-        # Step 2: Execute the query
+        return {"success": True, "query": task["query"]}
+
+    def execute_query(self, task: dict) -> dict:
+        user_id = task.get("user_id")
+        db_info = task.get("db_info")
+        query = task.get("query")
+
+        if not query:
+            return {"success": False, "error": "No query to execute."}
+
+        # Last check before the backend, whatever the caller validated
+        match = BANNED_PHRASES_RE.search(query)
+        if match:
+            return {"success": False, "error": f"Query contains unsafe keyword: {match.group(0).lower()}"}
+
         try:
-            result = backend_bridge.fetch_query_result(task["query"], db_info, user_id)
-            result["query"] = task["query"]
+            result = backend_bridge.fetch_query_result(query, db_info, user_id)
+            result["query"] = query
             result["success"] = True
             result["agentsCalled"] = ["query_agent"]
             return result
@@ -1,43 +1,112 @@
 # agents/schema_agent.py
 
 from .base_agent import BaseAgent
+from collections import OrderedDict
 import json
+import os
+import threading
+import time
 from tools import backend_bridge
+from tools.redis_cache import get_from_cache_with_ttl, set_in_cache
+
+SCHEMA_CACHE_TTL_SECONDS = int(os.getenv("SCHEMA_CACHE_TTL_SECONDS", 60))
+SCHEMA_CACHE_MAX_ENTRIES = 1024
+# Shared across workers and replicas, behind the in-process cache. A local
+# entry filled from Redis never outlives the Redis key, so a schema is at
+# most SCHEMA_REDIS_TTL_SECONDS stale.
+SCHEMA_REDIS_TTL_SECONDS = int(os.getenv("SCHEMA_REDIS_TTL_SECONDS", 300))
 
 class SchemaAgent(BaseAgent):
     def __init__(self, name: str, anthropic_client, model: str):
         super().__init__(name)
         self.client = anthropic_client
         self.model = model
-    
+        # (user_id, db_id) -> (expires_at, schema, schema_json), least recently used first
+        self._schema_cache = OrderedDict()
+        self._schema_cache_lock = threading.Lock()
+
+    def _get_cached_schema(self, key: tuple):
+        with self._schema_cache_lock:
+            entry = self._schema_cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._schema_cache[key]
+                return None
+            self._schema_cache.move_to_end(key)
+            return entry
+
+    def _cache_schema(self, key: tuple, schema, schema_json: str, ttl: int = SCHEMA_CACHE_TTL_SECONDS) -> None:
+        with self._schema_cache_lock:
+            self._schema_cache[key] = (time.monotonic() + ttl, schema, schema_json)
+            self._schema_cache.move_to_end(key)
+            while len(self._schema_cache) > SCHEMA_CACHE_MAX_ENTRIES:
+                self._schema_cache.popitem(last=False)
+
     def fetch_schema(self, task: dict) -> dict:
         user_id = task.get("user_id")
         db_info = task.get("db_info")
 
-        print(f"[SchemaAgent] Fetching schema for user {user_id} and DB {db_info.get('id')}...")
+        cache_key = (user_id, db_info.get("id"))
+        cached = self._get_cached_schema(cache_key)
+        if cached is not None:
+            return {"success": True, "schema": cached[1], "schema_json": cached[2]}
 
-        try:
-            response = backend_bridge.fetch_schema_for_user_db(db_info, user_id)
-            if response.get("success"):
-                schema = response.get("schema")
-                print(f"[SchemaAgent] Retrieved schema: {json.dumps(schema, indent=2)[:1000]}")  # truncated for safety
-                return {"success": True, "schema": schema}
-            else:
+        redis_key = f"schema:{user_id}:{db_info.get('id')}"
+        schema, local_ttl = self._get_shared_schema(redis_key)
+        if schema is None:
+            print(f"[SchemaAgent] Fetching schema for user {user_id} and DB {db_info.get('id')}...")
+
+            try:
+                response = backend_bridge.fetch_schema_for_user_db(db_info, user_id)
+            except Exception as e:
+                print(f"[SchemaAgent] Exception while fetching schema: {str(e)}")
+                return {"success": False, "error": str(e)}
+
+            if not response.get("success"):
                 print(f"[SchemaAgent] Failed to fetch schema: {response.get('error')}")
                 return {"success": False, "error": response.get("error")}
+
+            schema = response.get("schema")
+            self._share_schema(redis_key, schema)
+            local_ttl = SCHEMA_CACHE_TTL_SECONDS
+
+        # Serialized once per fetch and reused by every prompt built from
+        # this schema while it stays cached
+        schema_json = json.dumps(schema, indent=2)
+        self._cache_schema(cache_key, schema, schema_json, local_ttl)
+        return {"success": True, "schema": schema, "schema_json": schema_json}
+
+    def _get_shared_schema(self, key: str) -> tuple:
+        """
+        Returns (schema, local_ttl), with the local TTL capped at the Redis
+        key's remaining TTL.
+        """
+        try:
+            schema, redis_ttl = get_from_cache_with_ttl(key)
         except Exception as e:
-            print(f"[SchemaAgent] Exception while fetching schema: {str(e)}")
-            return {"success": False, "error": str(e)}
+            print(f"[SchemaAgent] Redis schema lookup failed: {str(e)}")
+            return None, SCHEMA_CACHE_TTL_SECONDS
+        if redis_ttl < 0:
+            return schema, SCHEMA_CACHE_TTL_SECONDS
+        return schema, min(redis_ttl, SCHEMA_CACHE_TTL_SECONDS)
 
+    def _share_schema(self, key: str, schema) -> None:
+        try:
+            set_in_cache(key, schema, expire_seconds=SCHEMA_REDIS_TTL_SECONDS)
+        except Exception as e:
+            print(f"[SchemaAgent] Redis schema store failed: {str(e)}")
 
     def run(self, task: dict) -> dict:
         schema = task.get("schema")
+        schema_json = task.get("schema_json")
         if not schema:
             # Try to fetch schema if not provided directly
             schema_result = self.fetch_schema(task)
             if not schema_result.get("success"):
                 return schema_result
             schema = schema_result.get("schema")
+            schema_json = schema_result.get("schema_json")
 
         prompt = f"""You are a schema analysis assistant. Analyze the following database schema and describe:
 
@@ -47,7 +116,7 @@ class SchemaAgent(BaseAgent):
 3. Example questions the user might ask
 
 SCHEMA:
-{json.dumps(schema, indent=2)}
+{schema_json or json.dumps(schema, indent=2)}
 """
 
         try:
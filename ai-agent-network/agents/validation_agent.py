@@ -1,13 +1,20 @@
 from .base_agent import BaseAgent
+import re
+
+# One case-insensitive pass over the query for every banned phrase
+# (";--" is covered by "--")
+BANNED_PHRASES_RE = re.compile(r"drop|delete|truncate|--", re.IGNORECASE)
 
 class ValidationAgent(BaseAgent):
     def __init__(self, name: str):
         super().__init__(name)
 
     def run(self, task: dict) -> dict:
-        query = task.get("query", "")
-        banned_phrases = ["drop", "delete", "truncate", "--", ";--"]
-        for phrase in banned_phrases:
-            if phrase in query.lower():
-                return {"success": False, "reason": f"Query contains unsafe keyword: {phrase}"}
+        query = task.get("query")
+        # Nothing to check is not the same as safe
+        if not query:
+            return {"success": False, "reason": "No query to validate"}
+        match = BANNED_PHRASES_RE.search(query)
+        if match:
+            return {"success": False, "reason": f"Query contains unsafe keyword: {match.group(0).lower()}"}
         return {"success": True}
@@ -1,21 +1,35 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
+from anyio import to_thread
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from crew import build_agent_network
+from tools.rate_limiter import enforce_rate_limit
+from tools.backend_bridge import register_ai_agent
 import os
 import json
+import hmac
+import random
 import asyncio
 
 load_dotenv()
 
 API_KEY = os.getenv("AI_API_KEY", "dev-mode-key")
+API_KEY_BYTES = API_KEY.encode()
+BEARER_PREFIX = "Bearer "
+AGENT_REGISTER_RETRY_SECONDS = 5
+AGENT_REGISTER_MAX_BACKOFF_SECONDS = 300
+AGENT_HEARTBEAT_SECONDS = int(os.getenv("AGENT_HEARTBEAT_SECONDS", 60))
+# Pipelines hold a worker thread while waiting on LLM/backend I/O, so size
+# the pool past anyio's default of 40
+THREADPOOL_SIZE = int(os.getenv("AI_THREADPOOL_SIZE", max(40, (os.cpu_count() or 1) * 4)))
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
 orchestrator = build_agent_network()
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,13 +39,49 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+
+@app.on_event("startup")
+async def configure_threadpool():
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+
+async def refresh_agent_registration(delay: int):
+    # Re-register periodically so the backend's registration (and last_seen)
+    # never lapses; back off while the backend is unreachable
+    while True:
+        # Jitter keeps workers and replicas from hitting the backend in lockstep
+        await asyncio.sleep(delay * (0.5 + random.random()))
+        result = await run_in_threadpool(register_ai_agent)
+        app.state.agent_registered = result.get("success", False)
+        if app.state.agent_registered:
+            delay = AGENT_HEARTBEAT_SECONDS
+        else:
+            delay = min(max(delay * 2, AGENT_REGISTER_RETRY_SECONDS), AGENT_REGISTER_MAX_BACKOFF_SECONDS)
+            print(f"Agent registration failed, retrying in ~{delay}s: {result.get('error')}")
+
+
+@app.on_event("startup")
+async def register_agent():
+    # Register from a background task, off the request path, so a slow or
+    # unreachable backend can't hold up startup
+    app.state.agent_registered = False
+    app.state.agent_registration_task = asyncio.create_task(refresh_agent_registration(0))
+
+
+@app.on_event("shutdown")
+async def stop_agent_registration():
+    task = getattr(app.state, "agent_registration_task", None)
+    if task:
+        task.cancel()
+
+
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
-def validate_api_key(auth: str = Depends(api_key_header)):
-    if not auth or not auth.startswith("Bearer "):
+async def validate_api_key(auth: str = Depends(api_key_header)):
+    if not auth or not auth.startswith(BEARER_PREFIX):
         raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-    token = auth.split(" ")[1]
-    if token != API_KEY:
+    token = auth[len(BEARER_PREFIX):]
+    if not hmac.compare_digest(token.encode(), API_KEY_BYTES):
         raise HTTPException(status_code=403, detail="Invalid API key")
 
 
@@ -49,6 +99,9 @@ async def health_check():
 
 @app.post("/api/v1/run", dependencies=[Depends(validate_api_key)])
 async def run_query(request: RunQueryRequest):
+    if not await enforce_rate_limit(request.user_id):
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+
     payload = {
         "message": request.task,
         "user_id": request.user_id,
@@ -58,9 +111,9 @@ async def run_query(request: RunQueryRequest):
         "visualize": request.visualize
     }
 
-    result = orchestrator.run(payload)
+    result = await run_in_threadpool(orchestrator.run, payload)
 
-    return JSONResponse({
+    return ORJSONResponse({
         "success": True,
         "final_output": {
             "query": result.get("query", ""),
@@ -93,17 +146,27 @@ async def websocket_query(ws: WebSocket):
 
             elif msg_type == "query":
                 task = data.get("task")
-                user_id = str(data.get("userId"))
+                user_id = data.get("userId")
                 db_id = data.get("dbId")
 
-                if not task or not db_id:
+                if not task or not db_id or not user_id:
                     await ws.send_json({
                         "type": "error",
-                        "message": "Missing task or dbId",
+                        "message": "Missing task, dbId or userId",
                         "errorCode": "MISSING_FIELDS"
                     })
                     continue
 
+                user_id = str(user_id)
+
+                if not await enforce_rate_limit(user_id):
+                    await ws.send_json({
+                        "type": "error",
+                        "message": "Rate limit exceeded",
+                        "errorCode": "RATE_LIMITED"
+                    })
+                    continue
+
                 await ws.send_json({
                     "type": "processing",
                     "message": "Processing your query..."
@@ -122,7 +185,7 @@ async def websocket_query(ws: WebSocket):
                     "visualize": True
                 }
 
-                result = orchestrator.run(payload)
+                result = await run_in_threadpool(orchestrator.run, payload)
 
                 await ws.send_json({
                     "type": "queryResult",
@@ -153,3 +216,18 @@ async def websocket_query(ws: WebSocket):
             "error": str(e),
             "errorCode": "SERVER_ERROR"
         })
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Run from the ai-agent-network root: python -m api.server
+    uvicorn.run(
+        "api.server:app",
+        host=os.getenv("AI_SERVER_HOST", "0.0.0.0"),
+        port=int(os.getenv("AI_SERVER_PORT", 5001)),
+        workers=int(os.getenv("AI_SERVER_WORKERS", 1)),
+        loop="uvloop",
+        http="httptools",
+        proxy_headers=True
+    )
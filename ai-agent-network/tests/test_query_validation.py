@@ -0,0 +1,104 @@
+# tests/test_query_validation.py
+# Run from the ai-agent-network root: python -m pytest tests
+
+from types import SimpleNamespace
+
+import pytest
+
+from agents import query_agent as query_agent_module
+from agents.orchestrator_agent import OrchestratorAgent
+from agents.query_agent import QueryAgent
+from agents.validation_agent import ValidationAgent
+
+
+class FakeLLM:
+    """
+    Stands in for the OpenAI client and always answers with the same SQL.
+    """
+    def __init__(self, sql: str):
+        completion = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=sql))]
+        )
+        self.chat = SimpleNamespace(
+            completions=SimpleNamespace(create=lambda **kwargs: completion)
+        )
+
+
+class StubAgent:
+    def __init__(self, result: dict):
+        self.result = result
+
+    def run(self, task: dict) -> dict:
+        return {**self.result, **task}
+
+    def fetch_schema(self, task: dict) -> dict:
+        return self.result
+
+
+def build_orchestrator(sql: str) -> OrchestratorAgent:
+    return OrchestratorAgent(
+        "Orchestrator",
+        chat_agent=StubAgent({}),
+        intent_agent=StubAgent({"intent": "query"}),
+        schema_agent=StubAgent({
+            "success": True,
+            "schema": {"users": ["id", "name"]},
+            "schema_json": "{}"
+        }),
+        query_agent=QueryAgent("QueryAgent", FakeLLM(sql), "test-model"),
+        validation_agent=ValidationAgent("ValidationAgent"),
+        analysis_agent=StubAgent({"summary": "ok"}),
+        memory_agent=StubAgent({})
+    )
+
+
+def make_task() -> dict:
+    return {
+        "message": "remove all users",
+        "user_id": "42",
+        "db_info": {"id": 1, "db_type": "postgres"},
+        "query": None
+    }
+
+
+@pytest.fixture
+def executed(monkeypatch):
+    calls = []
+
+    def fake_fetch_query_result(query, db_info, user_id):
+        calls.append(query)
+        return {"success": True, "data": {"success": True, "rows": []}}
+
+    monkeypatch.setattr(query_agent_module.backend_bridge, "fetch_query_result", fake_fetch_query_result)
+    return calls
+
+
+@pytest.mark.parametrize("sql", ["DROP TABLE users", "SELECT * FROM users; -- evil"])
+def test_generated_unsafe_sql_is_rejected_before_execution(executed, sql):
+    result = build_orchestrator(sql).run(make_task())
+
+    assert result["output"].startswith("Query rejected:")
+    assert executed == []
+
+
+def test_generated_safe_sql_is_executed(executed):
+    build_orchestrator("SELECT id FROM users").run(make_task())
+
+    assert executed == ["SELECT id FROM users"]
+
+
+def test_execute_query_refuses_unsafe_sql(executed):
+    agent = QueryAgent("QueryAgent", FakeLLM(""), "test-model")
+    task = {**make_task(), "query": "DROP TABLE users"}
+
+    result = agent.execute_query(task)
+
+    assert result["success"] is False
+    assert executed == []
+
+
+def test_missing_query_does_not_validate():
+    agent = ValidationAgent("ValidationAgent")
+
+    assert agent.run({"query": None})["success"] is False
+    assert agent.run({"query": ""})["success"] is False
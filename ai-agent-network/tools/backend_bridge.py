@@ -1,7 +1,9 @@
 # tools/backend_bridge.py
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import orjson
 import time
 import hmac
 import hashlib
@@ -19,22 +21,51 @@ BACKEND_SERVICE_ID = os.getenv("BACKEND_SERVICE_ID")
 AI_AGENT_ID = os.getenv("AI_AGENT_ID")
 AI_AGENT_VERSION = os.getenv("AI_AGENT_VERSION")
 
-def headers() -> dict:
-    return {
-        "Request-Secret": os.getenv("BACKEND_SECRET"),
-        "Content-Type": "application/json"
-    }
+SCHEMA_FETCH_URL = f"{BACKEND_API_URL}/api/query/schema/fetch"
+QUERY_EXECUTE_URL = f"{BACKEND_API_URL}/api/query/execute"
+CONVERSATION_STORE_URL = f"{BACKEND_API_URL}/api/query/conversation/store"
+CONTEXT_DETECT_URL = f"{BACKEND_API_URL}/api/query/context/detect"
+AGENT_REGISTER_URL = f"{BACKEND_API_URL}/api/auth/agent/register"
+HEALTH_URL = f"{BACKEND_API_URL}/api/health"
+
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", 64))
+# (connect, read) seconds; registration runs from a background loop that
+# must not hang on an unresponsive backend
+AGENT_REGISTER_TIMEOUT = (5, 10)
+
+# One keep-alive connection pool for every backend call instead of a new
+# TCP connection per request. Sized for the pipeline threadpool so
+# concurrent calls don't overflow it and discard connections.
+session = requests.Session()
+backend_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=BACKEND_POOL_SIZE, max_retries=0)
+session.mount("http://", backend_adapter)
+session.mount("https://", backend_adapter)
+
+BACKEND_TOKEN_TTL_SECONDS = 3600
+# Mint a new token this long before the cached one expires
+BACKEND_TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+_backend_token = None
+_backend_token_exp = 0
 
 
 def get_backend_token() -> str:
     """
-    Generates a time-based HMAC token for service-to-service auth.
+    Returns a time-based HMAC token for service-to-service auth.
+    The token is reused until it is close to expiry instead of being
+    re-signed for every backend call.
     """
+    global _backend_token, _backend_token_exp
+
     now = int(time.time())
+    if _backend_token and now < _backend_token_exp - BACKEND_TOKEN_REFRESH_MARGIN_SECONDS:
+        return _backend_token
+
+    exp = now + BACKEND_TOKEN_TTL_SECONDS
     payload = {
         "service_id": BACKEND_SERVICE_ID,
         "timestamp": now,
-        "exp": now + 3600
+        "exp": exp
     }
     payload_bytes = json.dumps(payload).encode("utf-8")
     payload_b64 = base64.b64encode(payload_bytes).decode("utf-8")
@@ -45,25 +76,40 @@ def get_backend_token() -> str:
         hashlib.sha256
     ).hexdigest()
 
-    return f"{payload_b64}.{signature}"
+    _backend_token = f"{payload_b64}.{signature}"
+    _backend_token_exp = exp
+    return _backend_token
+
+
+_headers = None
+_headers_token = None
 
 
 def headers() -> dict:
-    return {
-        "Authorization": f"Bearer {get_backend_token()}",
-        "Content-Type": "application/json"
-    }
+    """
+    Returns the request headers, rebuilt only when the service token rotates.
+    """
+    global _headers, _headers_token
+
+    token = get_backend_token()
+    if token is not _headers_token:
+        _headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+        _headers_token = token
+    return _headers
 
 
 def fetch_schema_for_user_db(db_info: dict, user_id: str) -> dict:
     try:
-        response = requests.post(
-            f"{BACKEND_API_URL}/api/query/schema/fetch",
-            json={"db_info": db_info, "user_id": user_id},
+        response = session.post(
+            SCHEMA_FETCH_URL,
+            data=orjson.dumps({"db_info": db_info, "user_id": user_id}),
             headers=headers()
         )
         response.raise_for_status()
-        return {"success": True, "schema": response.json()}
+        return {"success": True, "schema": orjson.loads(response.content)}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -77,22 +123,22 @@ def fetch_query_result(query: str, db_info: dict, user_id: str) -> dict:
             "user_id": user_id,
             "dbId": db_id
         }
-        response = requests.post(
-            f"{BACKEND_API_URL}/api/query/execute",
-            json=payload,
+        response = session.post(
+            QUERY_EXECUTE_URL,
+            data=orjson.dumps(payload),
             headers=headers()
         )
         response.raise_for_status()
-        return {"success": True, "data": response.json()}
+        return {"success": True, "data": orjson.loads(response.content)}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
 def save_conversation_to_backend(payload: dict) -> dict:
     try:
-        response = requests.post(
-            f"{BACKEND_API_URL}/api/query/conversation/store",
-            json=payload,
+        response = session.post(
+            CONVERSATION_STORE_URL,
+            data=orjson.dumps(payload),
             headers=headers()
         )
         response.raise_for_status()
@@ -103,28 +149,29 @@ def save_conversation_to_backend(payload: dict) -> dict:
 
 def detect_database_for_query(user_id: str, query: str) -> dict:
     try:
-        response = requests.post(
-            f"{BACKEND_API_URL}/api/query/context/detect",
-            json={"query": query, "user_id": user_id},
+        response = session.post(
+            CONTEXT_DETECT_URL,
+            data=orjson.dumps({"query": query, "user_id": user_id}),
             headers=headers()
         )
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
 def register_ai_agent() -> dict:
     try:
-        response = requests.post(
-            f"{BACKEND_API_URL}/api/auth/agent/register",
-            json={
+        response = session.post(
+            AGENT_REGISTER_URL,
+            data=orjson.dumps({
                 "agent_id": AI_AGENT_ID,
                 "version": AI_AGENT_VERSION,
                 "capabilities": ["query_generation", "schema_analysis", "visualization"],
                 "status": "online"
-            },
-            headers=headers()
+            }),
+            headers=headers(),
+            timeout=AGENT_REGISTER_TIMEOUT
         )
         response.raise_for_status()
         return {"success": True}
@@ -134,11 +181,11 @@ def register_ai_agent() -> dict:
 
 def health_check() -> dict:
     try:
-        response = requests.get(
-            f"{BACKEND_API_URL}/api/health",
+        response = session.get(
+            HEALTH_URL,
             headers=headers()
         )
         response.raise_for_status()
-        return {"success": True, "status": response.json()}
+        return {"success": True, "status": orjson.loads(response.content)}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -0,0 +1,62 @@
+# tools/rate_limiter.py
+
+import os
+import time
+import uuid
+from typing import Optional
+from dotenv import load_dotenv
+from tools.redis_cache import async_client
+
+load_dotenv()
+
+# Rate limiting is off unless RATE_LIMIT_MAX_REQUESTS is set
+RATE_LIMIT_MAX_REQUESTS = int(os.getenv("RATE_LIMIT_MAX_REQUESTS")) if os.getenv("RATE_LIMIT_MAX_REQUESTS") else None
+RATE_LIMIT_WINDOW_SECONDS = int(os.getenv("RATE_LIMIT_WINDOW_SECONDS", 60))
+
+# Rolling window over a sorted set scored by request time (ms). Trimming,
+# counting and recording happen atomically in one round-trip, so concurrent
+# requests and replicas cannot race past the limit.
+ROLLING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2]) * 1000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window_ms)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, now .. ':' .. ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window_ms)
+return 1
+"""
+
+# Script objects run via EVALSHA and reload the script on NOSCRIPT
+rolling_window = async_client.register_script(ROLLING_WINDOW_SCRIPT)
+
+def rate_limit_key(user_id: str) -> str:
+    """
+    The {user_id} hash tag pins all of a user's rate-limit keys to one
+    Redis Cluster slot, so scripts/pipelines over them stay single-slot.
+    """
+    return f"rate_limit:{{{user_id}}}"
+
+async def enforce_rate_limit(
+    user_id: str,
+    max_requests: Optional[int] = RATE_LIMIT_MAX_REQUESTS,
+    window_seconds: int = RATE_LIMIT_WINDOW_SECONDS
+) -> bool:
+    """
+    Record a request for the user and return True if it is within the limit.
+    Always allows when no limit is configured, and fails open when Redis is
+    unreachable so the pipeline keeps serving.
+    """
+    if max_requests is None:
+        return True
+
+    try:
+        allowed = await rolling_window(
+            keys=[rate_limit_key(user_id)],
+            args=[int(time.time() * 1000), window_seconds, max_requests, uuid.uuid4().hex]
+        )
+        return allowed == 1
+    except Exception as e:
+        print(f"[RateLimiter] Skipping rate limit, Redis unavailable: {str(e)}")
+        return True
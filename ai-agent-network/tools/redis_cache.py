@@ -1,7 +1,8 @@
 # tools/redis_cache.py
 
 import redis
-import json
+import redis.asyncio as aioredis
+import orjson
 import os
 from dotenv import load_dotenv
 
@@ -10,14 +11,41 @@ load_dotenv()
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
+# Set when Redis is co-located to skip the TCP loopback stack
+REDIS_SOCKET_PATH = os.getenv("REDIS_SOCKET_PATH")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 64))
+# Bounds how long an unresponsive Redis can stall a caller before the call
+# raises and the caller falls back
+REDIS_SOCKET_TIMEOUT_SECONDS = float(os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", 1))
 
-client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+pool_options = {
+    "socket_connect_timeout": REDIS_SOCKET_TIMEOUT_SECONDS,
+    "socket_timeout": REDIS_SOCKET_TIMEOUT_SECONDS
+}
+if REDIS_SOCKET_PATH:
+    REDIS_URL = f"unix://{REDIS_SOCKET_PATH}?db={REDIS_DB}"
+else:
+    REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+    pool_options["socket_keepalive"] = True
+
+# Blocking pools make callers wait for a free connection instead of failing
+# when every connection is busy. redis-py parses replies with hiredis when
+# it is installed.
+client = redis.Redis(connection_pool=redis.BlockingConnectionPool.from_url(
+    REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS, **pool_options
+))
+
+# For calls made directly from async request handlers, so Redis round-trips
+# don't block the event loop
+async_client = aioredis.Redis(connection_pool=aioredis.BlockingConnectionPool.from_url(
+    REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS, **pool_options
+))
 
 def set_in_cache(key: str, value: dict, expire_seconds: int = 900) -> None:
     """
     Save data to Redis with optional TTL
     """
-    client.set(key, json.dumps(value), ex=expire_seconds)
+    client.set(key, orjson.dumps(value), ex=expire_seconds)
 
 def get_from_cache(key: str) -> dict:
     """
@@ -25,9 +53,22 @@ def get_from_cache(key: str) -> dict:
     """
     val = client.get(key)
     if val:
-        return json.loads(val)
+        return orjson.loads(val)
     return None
 
+def get_from_cache_with_ttl(key: str) -> tuple:
+    """
+    Retrieve data and its remaining TTL in seconds from Redis in one round-trip.
+    The TTL is negative when the key has no expiry.
+    """
+    pipe = client.pipeline(transaction=False)
+    pipe.get(key)
+    pipe.ttl(key)
+    val, ttl = pipe.execute()
+    if val:
+        return orjson.loads(val), ttl
+    return None, ttl
+
 def delete_from_cache(key: str) -> None:
     client.delete(key)
 